@@ -6,189 +6,552 @@ A tool for creating interactive visualizations of Terraform dependency graphs
 using d3.js and Graphviz for layout.
 """
 
+import io
 import os
 import sys
+import re
+import gzip
 import json
+import pickle
+import shutil
+import hashlib
 import argparse
+import contextlib
 import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import chain, repeat
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from types import MappingProxyType
+from typing import Dict, List, Any, Iterator, Optional, Tuple, Union
 import networkx as nx
 import hcl2
-from flask import Flask, render_template, request, jsonify, send_from_directory
-import graphviz
+from flask import Flask, Response, abort, jsonify, request, send_from_directory
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+try:
+    # Optional Rust-based parser (hcl-rs bindings); much faster than the Lark grammar
+    import hcl_rs as _hcl_rs
+except ImportError:
+    _hcl_rs = None
+
+try:
+    # Optional Rust JSON encoder; much faster on multi-thousand-node graphs
+    import orjson
+    
+    def _dumps_bytes(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+    
+    def _dumps_indented(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    orjson = None
+    
+    def _dumps_bytes(obj: Any) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+    
+    def _dumps_indented(obj: Any) -> bytes:
+        return json.dumps(obj, indent=2).encode('utf-8')
+
+
+def _dumps(obj: Any) -> str:
+    return _dumps_bytes(obj).decode('utf-8')
+
+
+# Same escapes as Jinja's htmlsafe_json_dumps, so JSON can sit inside a <script> block
+_SCRIPT_SAFE = str.maketrans({'<': '\\u003c', '>': '\\u003e', '&': '\\u0026', "'": '\\u0027'})
+
+
+def _script_safe(json_text: str) -> str:
+    """Escape serialized JSON so no string in it can close or break out of a script tag."""
+    return json_text.translate(_SCRIPT_SAFE)
+
+__version__ = '1.1.0'
+
+# Interpolated expressions, or bare data./module. strings from parsers that do not wrap them
+_DEP_RE = re.compile(r'\$\{([^}]+)\}|(?<=")(data\.[\w-]+\.[\w-]+|module\.[\w-]+)')
+# Expression roots that name values rather than blocks
+_NON_BLOCK_PREFIXES = frozenset({'var', 'local', 'each', 'count', 'path', 'self', 'terraform'})
+# Block addresses inside an expression: data.TYPE.NAME, module.NAME or TYPE.NAME,
+# with the value roots above rejected by the pattern itself
+_REF_RE = re.compile(
+    r'(?<![\w.\-"])(?!(?:' + '|'.join(sorted(_NON_BLOCK_PREFIXES)) + r')\.)'
+    r'(data\.[A-Za-z_][\w-]*\.[A-Za-z_][\w-]*|module\.[A-Za-z_][\w-]*|[A-Za-z_][\w-]*\.[A-Za-z_][\w-]*)'
+)
+
+# Directories that never hold configuration worth graphing
+_SKIP_DIRS = frozenset({'.terraform', '.git', 'node_modules'})
+
+# Per-node-type presentation, shared by the Graphviz and d3.js outputs
+_NODE_COLOR = MappingProxyType({
+    'resource': '#4CAF50',
+    'data': '#2196F3',
+    'module': '#FF9800'
+})
+_NODE_SHAPE = MappingProxyType({
+    'resource': 'box',
+    'data': 'ellipse',
+    'module': 'diamond'
+})
+_NODE_GROUP = MappingProxyType({
+    'resource': 1,
+    'data': 2,
+    'module': 3
+})
+_DEFAULT_COLOR = '#9E9E9E'
+_DEFAULT_SHAPE = 'box'
+_DEFAULT_GROUP = 0
+
+# Accelerated NetworkX backends to dispatch graph analytics to, fastest first
+_PREFERRED_BACKENDS = ('cugraph', 'graphblas')
+
+# Below this many files the process pool costs more than it saves
+PARALLEL_MIN_FILES = 16
+
+TEMPLATE_DIR = Path(__file__).parent / 'templates'
+STATIC_DIR = Path(__file__).parent / 'static'
+
+# Parsed-file cache; entries are version-stamped so code changes never serve stale data
+DEFAULT_CACHE_DIR = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache') / 'tgw' / 'hcl'
+
+# Bump whenever _parse_source or _extract_dependencies changes what they return
+_CACHE_SCHEMA = 3
+# The backends' output differs, so installing or removing hcl-rs starts a fresh cache
+_CACHE_BACKEND = 'rs' if _hcl_rs is not None else 'py'
+_CACHE_PREFIX = f"{__version__}-s{_CACHE_SCHEMA}-{_CACHE_BACKEND}"
+
+# The stat index keeps entries for this many most recently parsed roots
+STAT_INDEX_MAX_ROOTS = 32
+
+
+def _extract_dependencies(config: Dict[str, Any]) -> List[str]:
+    """Extract resource dependencies from configuration.
+    
+    References are found with one regex sweep over the serialized config
+    rather than a recursive walk, and normalized to the address of the block
+    they point at (``aws_vpc.main.id`` -> ``aws_vpc.main``).
+    """
+    text = json.dumps(config, separators=(',', ':'), default=str)
+    dependencies = set()
+    
+    for match in _DEP_RE.finditer(text):
+        expression, bare_ref = match.groups()
+        if bare_ref is not None:
+            dependencies.add(bare_ref)
+            continue
+        dependencies.update(_REF_RE.findall(expression))
+    
+    # Module sources only ever appear at the top level of a block
+    source = config.get('source') if isinstance(config, dict) else None
+    if isinstance(source, str):
+        dependencies.add(source)
+        
+    return sorted(dependencies)
+
+
+def _loads_hcl(content: str) -> Dict[str, Any]:
+    """Parse HCL2 source, preferring the hcl-rs backend when it is installed."""
+    if _hcl_rs is not None:
+        return _hcl_rs.loads(content)
+    return hcl2.loads(content)
+
+
+def _iter_blocks(blocks: Any):
+    """Yield the label->body mappings of a top-level block.
+
+    python-hcl2 returns a list with one mapping per block, hcl-rs returns a
+    single merged mapping; both are walked the same way.
+    """
+    if isinstance(blocks, dict):
+        yield blocks
+    else:
+        yield from blocks
+
+
+def _parse_source(content: str, rel: str) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+    """Parse HCL2 source into its resources, data sources and modules."""
+    resources = {}
+    data_sources = {}
+    modules = {}
+    
+    # Block types and file names repeat across many nodes; share one object each
+    _intern = sys.intern
+    rel = _intern(rel)
+    
+    # Parse HCL2
+    parsed = _loads_hcl(content)
+    
+    # Extract resources
+    for block in _iter_blocks(parsed.get('resource', ())):
+        for resource_type, resource_instances in block.items():
+            for resource_name, resource_config in resource_instances.items():
+                full_name = f"{resource_type}.{resource_name}"
+                resources[full_name] = {
+                    'type': _intern(resource_type),
+                    'name': resource_name,
+                    'file': rel,
+                    'config': resource_config,
+                    'dependencies': _extract_dependencies(resource_config)
+                }
+    
+    # Extract data sources
+    for block in _iter_blocks(parsed.get('data', ())):
+        for data_type, data_instances in block.items():
+            for data_name, data_config in data_instances.items():
+                full_name = f"data.{data_type}.{data_name}"
+                data_sources[full_name] = {
+                    'type': _intern(data_type),
+                    'name': data_name,
+                    'file': rel,
+                    'config': data_config,
+                    'dependencies': _extract_dependencies(data_config)
+                }
+    
+    # Extract modules
+    for block in _iter_blocks(parsed.get('module', ())):
+        for module_name, module_config in block.items():
+            # Keyed by address so module.NAME references resolve to this block
+            modules[f"module.{module_name}"] = {
+                'name': module_name,
+                'file': rel,
+                'config': module_config,
+                'dependencies': _extract_dependencies(module_config)
+            }
+            
+    return resources, data_sources, modules
+
+
+def _iter_tf(root: str) -> Iterator[Tuple[str, str, Optional[Tuple[int, int]]]]:
+    """Yield (path, relative path, (mtime_ns, size)) for every .tf file below root.
+    
+    Uses os.scandir so directory entries need no Path object and the stat
+    comes from the DirEntry, and skips provider caches, VCS metadata and
+    vendored trees entirely. The stat is None when it cannot be read.
+    """
+    stack = [(root, '')]
+    while stack:
+        directory, rel_dir = stack.pop()
+        try:
+            it = os.scandir(directory)
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name in _SKIP_DIRS or entry.name.startswith('.'):
+                        continue
+                    stack.append((entry.path, os.path.join(rel_dir, entry.name)))
+                elif entry.name.endswith('.tf'):
+                    try:
+                        st = entry.stat()
+                        stat = (st.st_mtime_ns, st.st_size)
+                    except OSError:
+                        stat = None
+                    yield entry.path, os.path.join(rel_dir, entry.name), stat
+
+
+def _analysis_backends() -> contextlib.AbstractContextManager:
+    """Run NetworkX algorithms on the fastest installed backend (nx-cugraph, graphblas-algorithms).
+    
+    Needs NetworkX's dispatch config (3.4+); otherwise, or when no accelerated
+    backend is installed, algorithms simply run on NetworkX itself.
+    """
+    installed = getattr(getattr(nx.utils, 'backends', None), 'backends', {})
+    priority = [name for name in _PREFERRED_BACKENDS if name in installed]
+    config = getattr(nx, 'config', None)
+    if not priority or not callable(config):
+        return contextlib.nullcontext()
+    try:
+        return config(backend_priority=priority)
+    except (TypeError, ValueError):
+        return contextlib.nullcontext()
+
+
+def _dot_quote(value: Any) -> str:
+    """Escape a value for use inside a double-quoted DOT string."""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"')
+
+
+def _cache_key(rel: str, content: bytes) -> str:
+    """Fingerprint a file by its relative path and raw contents."""
+    digest = hashlib.blake2b(rel.encode('utf-8'), digest_size=20)
+    digest.update(b'\0')
+    digest.update(content)
+    return digest.hexdigest()
+
+
+def _cache_path(cache_dir: Path, key: str) -> Path:
+    return cache_dir / f"{_CACHE_PREFIX}-{key}.pkl"
+
+
+def _cache_load(path: Path) -> Any:
+    """Load a pickled cache entry, returning None when it is missing or unreadable."""
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except Exception:
+        return None
+
+
+def _cache_store(path: Path, value: Any) -> None:
+    """Atomically write a pickled cache entry; failures only cost a future re-parse."""
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+
+
+def _parse_one_tf(tf_file: str, rel: str, cache_dir: Optional[Path] = None,
+                  key: Optional[str] = None) -> Tuple[str, Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]]:
+    """Parse a single .tf file, returning its cache key and extracted blocks.
+
+    ``key`` is the fingerprint recorded for this file when its mtime and size
+    were last seen; if given, the cache is probed before the file is read.
+    """
+    if cache_dir is not None and key is not None:
+        cached = _cache_load(_cache_path(cache_dir, key))
+        if cached is not None:
+            return key, cached
+    
+    # Hash the raw bytes; only a cache miss pays for decoding
+    with open(tf_file, 'rb') as f:
+        content = f.read()
+    key = _cache_key(rel, content)
+    
+    if cache_dir is not None:
+        cached = _cache_load(_cache_path(cache_dir, key))
+        if cached is not None:
+            return key, cached
+    
+    # Text-mode open used to translate CRLF; python-hcl2 cannot parse it
+    result = _parse_source(content.decode('utf-8').replace('\r\n', '\n'), rel)
+    if cache_dir is not None:
+        _cache_store(_cache_path(cache_dir, key), result)
+    return key, result
+
+
+def _safe_parse_one_tf(tf_file: str, rel: str, cache_dir: Optional[Path] = None,
+                       key: Optional[str] = None) -> Tuple[bool, Any]:
+    """Run _parse_one_tf, returning (ok, result_or_error) so one bad file never sinks the pool."""
+    try:
+        return True, _parse_one_tf(tf_file, rel, cache_dir, key)
+    except Exception as e:
+        # Parser exceptions may not pickle, so only a message crosses the process boundary
+        return False, f"{type(e).__name__}: {e}"
+
+
+@dataclass
+class Graph:
+    """Terraform dependency graph: node attributes by id, and (dependency, dependent) edges.
+    
+    A plain adjacency-list container is all the exporters need; NetworkX is
+    only built, via to_networkx(), for graph algorithms.
+    """
+    __slots__ = ('nodes', 'edges')
+    nodes: Dict[str, Dict[str, Any]]
+    edges: List[Tuple[str, str]]
+    
+    def to_networkx(self) -> nx.DiGraph:
+        G = nx.DiGraph()
+        G.add_nodes_from(self.nodes.items())
+        G.add_edges_from(self.edges)
+        return G
 
 
 class BlastRadius:
     """Main Blast Radius application class."""
     
-    def __init__(self):
+    # Above this many nodes, hierarchical dot layout gives way to the scalable sfdp engine
+    LARGE_GRAPH_THRESHOLD = 200
+    
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = DEFAULT_CACHE_DIR):
         self.app = Flask(__name__)
         self.graph_data = None
         self.terraform_path = None
+        self._graph = None
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        # Rendered output keyed by _fingerprint() of the parsed data
+        self._json_cache = {}
+        self._html_cache = {}
+        # Compiled once; rendering only splices in the serialized graph
+        env = Environment(loader=FileSystemLoader(str(TEMPLATE_DIR)), autoescape=select_autoescape())
+        self._tmpl = env.get_template('index.html')
         
     def parse_terraform(self, path: str) -> Dict[str, Any]:
         """Parse Terraform configuration files and extract resource dependencies."""
         path = Path(path)
+        tf_files = self._scan_dir(path)
+        
+        # Files whose mtime and size are unchanged can go straight to the cache
+        stat_index = self._load_stat_index()
+        root_key = str(path.resolve())
+        index_keys = [(root_key, rel) for _, rel, _ in tf_files]
+        keys = []
+        for (_, _, stat), index_key in zip(tf_files, index_keys):
+            entry = stat_index.get(index_key)
+            keys.append(entry[2] if entry and stat and entry[:2] == stat else None)
+        
+        # Parsing is CPU-bound, so fan large trees out across processes
+        if len(tf_files) < PARALLEL_MIN_FILES:
+            results = [_safe_parse_one_tf(tf_file, rel, self.cache_dir, key)
+                       for (tf_file, rel, _), key in zip(tf_files, keys)]
+        else:
+            with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+                file_paths, rels, _ = zip(*tf_files)
+                results = list(executor.map(_safe_parse_one_tf, file_paths, rels,
+                                            repeat(self.cache_dir), keys, chunksize=8))
+        
+        # Re-add this root's entries last: deleted files drop out and dict order tracks recency
+        stat_index = {index_key: entry for index_key, entry in stat_index.items() if index_key[0] != root_key}
+        parsed = []
+        for (tf_file, _, stat), index_key, (ok, result) in zip(tf_files, index_keys, results):
+            if not ok:
+                print(f"Warning: Error parsing {tf_file}: {result}")
+                continue
+            key, blocks = result
+            parsed.append(blocks)
+            if stat is not None:
+                stat_index[index_key] = (*stat, key)
+        
+        self._save_stat_index(stat_index)
+        
+        return self._merge_parsed(parsed, str(path))
+    
+    def parse_terraform_from_sources(self, sources: Dict[str, str], path: str = '') -> Dict[str, Any]:
+        """Parse in-memory Terraform sources keyed by file name, without touching disk."""
+        parsed = []
+        for rel, content in sources.items():
+            try:
+                parsed.append(_parse_source(content, rel))
+            except Exception as e:
+                print(f"Warning: Error parsing {rel}: {e}")
+                
+        return self._merge_parsed(parsed, path)
+    
+    def _scan_dir(self, path: Path) -> List[Tuple[str, str, Optional[Tuple[int, int]]]]:
+        """Find all .tf files under path as (path, path relative to the root, stat) triples."""
         if not path.exists():
             raise FileNotFoundError(f"Path not found: {path}")
             
-        resources = {}
-        data_sources = {}
-        modules = {}
-        
-        # Find all .tf files
-        tf_files = list(path.rglob("*.tf"))
+        tf_files = list(_iter_tf(str(path)))
         if not tf_files:
             raise ValueError(f"No Terraform files found in {path}")
             
         print(f"Found {len(tf_files)} Terraform files")
+        return tf_files
+    
+    def _merge_parsed(self, parsed: List[Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]],
+                      path: str) -> Dict[str, Any]:
+        """Combine per-file (resources, data_sources, modules) into one parse result."""
+        resources = {}
+        data_sources = {}
+        modules = {}
         
-        for tf_file in tf_files:
-            try:
-                with open(tf_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    
-                # Parse HCL2
-                parsed = hcl2.loads(content)
-                
-                # Extract resources
-                if 'resource' in parsed:
-                    for resource_type, resource_instances in parsed['resource']:
-                        for resource_name, resource_config in resource_instances:
-                            full_name = f"{resource_type}.{resource_name}"
-                            resources[full_name] = {
-                                'type': resource_type,
-                                'name': resource_name,
-                                'file': str(tf_file.relative_to(path)),
-                                'config': resource_config,
-                                'dependencies': self._extract_dependencies(resource_config)
-                            }
-                
-                # Extract data sources
-                if 'data' in parsed:
-                    for data_type, data_instances in parsed['data']:
-                        for data_name, data_config in data_instances:
-                            full_name = f"data.{data_type}.{data_name}"
-                            data_sources[full_name] = {
-                                'type': data_type,
-                                'name': data_name,
-                                'file': str(tf_file.relative_to(path)),
-                                'config': data_config,
-                                'dependencies': self._extract_dependencies(data_config)
-                            }
-                
-                # Extract modules
-                if 'module' in parsed:
-                    for module_name, module_config in parsed['module']:
-                        modules[module_name] = {
-                            'name': module_name,
-                            'file': str(tf_file.relative_to(path)),
-                            'config': module_config,
-                            'dependencies': self._extract_dependencies(module_config)
-                        }
-                        
-            except Exception as e:
-                print(f"Warning: Error parsing {tf_file}: {e}")
-                continue
-                
+        for file_resources, file_data_sources, file_modules in parsed:
+            resources.update(file_resources)
+            data_sources.update(file_data_sources)
+            modules.update(file_modules)
+            
         return {
             'resources': resources,
             'data_sources': data_sources,
             'modules': modules,
-            'path': str(path)
+            'path': path
         }
     
-    def _extract_dependencies(self, config: Dict[str, Any]) -> List[str]:
-        """Extract resource dependencies from configuration."""
-        dependencies = []
-        
-        def extract_refs(obj):
-            if isinstance(obj, dict):
-                for key, value in obj.items():
-                    if key == 'source' and isinstance(value, str):
-                        # Module source
-                        dependencies.append(value)
-                    elif isinstance(value, str) and value.startswith(('${', 'data.', 'module.')):
-                        # Resource references
-                        ref = value.strip('${}')
-                        if ref.startswith(('data.', 'module.')):
-                            dependencies.append(ref)
-                    elif isinstance(value, (dict, list)):
-                        extract_refs(value)
-            elif isinstance(obj, list):
-                for item in obj:
-                    extract_refs(item)
-                    
-        extract_refs(config)
-        return list(set(dependencies))
-    
-    def generate_graph(self, data: Dict[str, Any]) -> nx.DiGraph:
-        """Generate a NetworkX directed graph from Terraform data."""
-        G = nx.DiGraph()
-        
-        # Add nodes for all resources
+    def _stat_index_path(self) -> Optional[Path]:
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / f"{_CACHE_PREFIX}-index.pkl"
+    
+    def _load_stat_index(self) -> Dict[Tuple[str, str], Tuple[int, int, str]]:
+        """Load the (root, file) -> (mtime_ns, size, cache key) index used to skip hashing."""
+        index_path = self._stat_index_path()
+        if index_path is None:
+            return {}
+        index = _cache_load(index_path)
+        return index if isinstance(index, dict) else {}
+    
+    def _save_stat_index(self, index: Dict[Tuple[str, str], Tuple[int, int, str]]) -> None:
+        """Persist the stat index, keeping only the most recently parsed roots."""
+        index_path = self._stat_index_path()
+        if index_path is None:
+            return
+        roots = list(dict.fromkeys(root for root, _ in index))
+        if len(roots) > STAT_INDEX_MAX_ROOTS:
+            keep = set(roots[-STAT_INDEX_MAX_ROOTS:])
+            index = {index_key: entry for index_key, entry in index.items() if index_key[0] in keep}
+        _cache_store(index_path, index)
+    
+    def generate_graph(self, data: Dict[str, Any]) -> Graph:
+        """Generate a directed dependency graph from Terraform data."""
+        nodes = {}
         for resource_name, resource_info in data['resources'].items():
-            G.add_node(resource_name, 
-                      type='resource',
-                      resource_type=resource_info['type'],
-                      name=resource_info['name'],
-                      file=resource_info['file'])
-        
-        # Add nodes for data sources
+            nodes[resource_name] = {'type': 'resource',
+                                    'resource_type': resource_info['type'],
+                                    'name': resource_info['name'],
+                                    'file': resource_info['file']}
         for data_name, data_info in data['data_sources'].items():
-            G.add_node(data_name,
-                      type='data',
-                      resource_type=data_info['type'],
-                      name=data_info['name'],
-                      file=data_info['file'])
-        
-        # Add nodes for modules
+            nodes[data_name] = {'type': 'data',
+                                'resource_type': data_info['type'],
+                                'name': data_info['name'],
+                                'file': data_info['file']}
         for module_name, module_info in data['modules'].items():
-            G.add_node(module_name,
-                      type='module',
-                      name=module_name,
-                      file=module_info['file'])
+            nodes[module_name] = {'type': 'module',
+                                  'name': module_info['name'],
+                                  'file': module_info['file']}
         
-        # Add edges for dependencies
-        for resource_name, resource_info in data['resources'].items():
-            for dep in resource_info['dependencies']:
-                if dep in G.nodes:
-                    G.add_edge(dep, resource_name)
-        
-        for data_name, data_info in data['data_sources'].items():
-            for dep in data_info['dependencies']:
-                if dep in G.nodes:
-                    G.add_edge(dep, data_name)
-        
-        for module_name, module_info in data['modules'].items():
-            for dep in module_info['dependencies']:
-                if dep in G.nodes:
-                    G.add_edge(dep, module_name)
+        return Graph(nodes=nodes, edges=self._dependency_edges(data))
+    
+    def get_blast_radius(self, graph: Union[Graph, nx.DiGraph], node: str) -> List[str]:
+        """List every block that transitively depends on ``node``.
         
-        return G
+        Pass a NetworkX graph (``Graph.to_networkx()``) when querying repeatedly
+        to avoid converting on every call.
+        """
+        if isinstance(graph, Graph):
+            graph = graph.to_networkx()
+        if node not in graph:
+            raise KeyError(node)
+        with _analysis_backends():
+            return sorted(nx.descendants(graph, node))
+    
+    def _dependency_edges(self, data: Dict[str, Any]) -> List[Tuple[str, str]]:
+        """List unique (dependency, dependent) pairs whose endpoints are both known blocks."""
+        # Check membership against a plain set rather than a NetworkX NodeView
+        all_node_ids = set(data['resources']) | set(data['data_sources']) | set(data['modules'])
+        blocks = chain(data['resources'].items(), data['data_sources'].items(), data['modules'].items())
+        return [
+            (dep, name)
+            for name, info in blocks
+            # dict.fromkeys drops repeated dependencies while keeping output order stable
+            for dep in dict.fromkeys(info['dependencies'])
+            if dep in all_node_ids
+        ]
     
-    def export_html(self, graph: nx.DiGraph, output_path: str) -> str:
-        """Export interactive HTML visualization."""
-        # Convert graph to JSON for d3.js
-        graph_data = self._graph_to_json(graph)
+    def export_html(self, graph: Union[Graph, Dict[str, Any]], output_path: str) -> str:
+        """Export interactive HTML visualization.
         
+        ``graph`` may be a generated graph or the parsed Terraform data itself;
+        the latter skips building a graph that would only be serialized.
+        """
         # Create output directory
         output_dir = Path(output_path)
         output_dir.mkdir(parents=True, exist_ok=True)
         
         # Copy static files
-        static_dir = Path(__file__).parent / 'static'
-        if static_dir.exists():
-            import shutil
-            shutil.copytree(static_dir, output_dir / 'static', dirs_exist_ok=True)
+        if STATIC_DIR.exists():
+            self._sync_static(STATIC_DIR, output_dir / 'static')
         
         # Render HTML template
-        template_path = Path(__file__).parent / 'templates'
-        if not template_path.exists():
-            template_path.mkdir(parents=True)
-        
-        html_content = self._generate_html_template(graph_data)
+        html_content = self._to_html(graph)
         
         output_file = output_dir / 'index.html'
         with open(output_file, 'w', encoding='utf-8') as f:
@@ -196,88 +559,175 @@ class BlastRadius:
         
         return str(output_file)
     
-    def export_svg(self, graph: nx.DiGraph, output_path: str) -> str:
-        """Export SVG visualization using Graphviz."""
-        dot = graphviz.Digraph(comment='Terraform Dependency Graph')
-        dot.attr(rankdir='TB')
+    def _build_dot(self, graph: Graph) -> str:
+        """Build the DOT source shared by the SVG and PNG exports."""
+        buf = io.StringIO()
+        write = buf.write
+        write('// Terraform Dependency Graph\ndigraph G {\n')
+        if len(graph.nodes) > self.LARGE_GRAPH_THRESHOLD:
+            # dot's ranking is superlinear; a force-directed layout scales to big trees
+            write('layout=sfdp;\noverlap=prism;\nsplines=true;\n')
+        else:
+            write('rankdir=TB;\n')
         
         # Add nodes
-        for node, attrs in graph.nodes(data=True):
+        color_of = _NODE_COLOR.get
+        shape_of = _NODE_SHAPE.get
+        for node, attrs in graph.nodes.items():
             node_type = attrs.get('type', 'resource')
-            color = self._get_node_color(node_type)
-            shape = self._get_node_shape(node_type)
+            color = color_of(node_type, _DEFAULT_COLOR)
+            shape = shape_of(node_type, _DEFAULT_SHAPE)
             
-            dot.node(node, attrs.get('name', node), 
-                    color=color, shape=shape, style='filled')
+            write(f'"{_dot_quote(node)}" [label="{_dot_quote(attrs.get("name", node))}",'
+                  f'color="{color}",shape="{shape}",style=filled];\n')
         
         # Add edges
-        for edge in graph.edges():
-            dot.edge(edge[0], edge[1])
-        
-        # Generate SVG
-        output_file = Path(output_path)
-        output_file.parent.mkdir(parents=True, exist_ok=True)
+        for source, target in graph.edges:
+            write(f'"{_dot_quote(source)}" -> "{_dot_quote(target)}";\n')
         
-        dot.render(str(output_file.with_suffix('')), format='svg', cleanup=True)
-        return str(output_file.with_suffix('.svg'))
+        write('}\n')
+        return buf.getvalue()
     
-    def export_png(self, graph: nx.DiGraph, output_path: str) -> str:
+    def _render_dot(self, source: str, outputs: Dict[str, Path]) -> None:
+        """Run dot once over stdin, writing every requested format from a single layout."""
+        cmd = ['dot']
+        for fmt, output_file in outputs.items():
+            output_file.parent.mkdir(parents=True, exist_ok=True)
+            cmd += [f'-T{fmt}', f'-o{output_file}']
+        
+        try:
+            subprocess.run(cmd, input=source.encode('utf-8'), capture_output=True, check=True)
+        except FileNotFoundError:
+            raise RuntimeError("Graphviz 'dot' executable not found; make sure Graphviz is on your PATH")
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"Graphviz failed: {e.stderr.decode('utf-8', 'replace').strip()}")
+    
+    def export_images(self, graph: Graph, output_paths: Dict[str, str]) -> Dict[str, str]:
+        """Export Graphviz renderings, e.g. {'svg': path, 'png': path}, sharing one layout pass."""
+        outputs = {fmt: Path(path).with_suffix(f'.{fmt}') for fmt, path in output_paths.items()}
+        self._render_dot(self._build_dot(graph), outputs)
+        return {fmt: str(output_file) for fmt, output_file in outputs.items()}
+    
+    def export_svg(self, graph: Graph, output_path: str) -> str:
+        """Export SVG visualization using Graphviz."""
+        return self.export_images(graph, {'svg': output_path})['svg']
+    
+    def export_png(self, graph: Graph, output_path: str) -> str:
         """Export PNG visualization using Graphviz."""
-        dot = graphviz.Digraph(comment='Terraform Dependency Graph')
-        dot.attr(rankdir='TB')
-        
-        # Add nodes
-        for node, attrs in graph.nodes(data=True):
-            node_type = attrs.get('type', 'resource')
-            color = self._get_node_color(node_type)
-            shape = self._get_node_shape(node_type)
-            
-            dot.node(node, attrs.get('name', node), 
-                    color=color, shape=shape, style='filled')
-        
-        # Add edges
-        for edge in graph.edges():
-            dot.edge(edge[0], edge[1])
-        
-        # Generate PNG
-        output_file = Path(output_path)
-        output_file.parent.mkdir(parents=True, exist_ok=True)
-        
-        dot.render(str(output_file.with_suffix('')), format='png', cleanup=True)
-        return str(output_file.with_suffix('.png'))
+        return self.export_images(graph, {'png': output_path})['png']
     
-    def export_json(self, graph: nx.DiGraph, output_path: str) -> str:
-        """Export graph data as JSON."""
-        graph_data = self._graph_to_json(graph)
+    def export_json(self, graph: Union[Graph, Dict[str, Any]], output_path: str) -> str:
+        """Export graph data as JSON, from a generated graph or parsed Terraform data."""
+        graph_data = self._to_json(graph)
         
         output_file = Path(output_path)
         output_file.parent.mkdir(parents=True, exist_ok=True)
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(graph_data, f, indent=2)
+        output_file.write_bytes(_dumps_indented(graph_data))
         
         return str(output_file)
     
-    def _graph_to_json(self, graph: nx.DiGraph) -> Dict[str, Any]:
-        """Convert NetworkX graph to JSON format for d3.js."""
+    def _sync_static(self, static_dir: Path, dest: Path) -> None:
+        """Mirror static assets into dest, skipping the work when nothing changed.
+        
+        Files are hardlinked where possible so no bytes are copied; a stamp of
+        every source file's path, mtime and size marks an up-to-date mirror.
+        """
+        files = []
+        stack = [(str(static_dir), '')]
+        while stack:
+            directory, rel_dir = stack.pop()
+            with os.scandir(directory) as it:
+                for entry in it:
+                    rel = os.path.join(rel_dir, entry.name)
+                    if entry.is_dir():
+                        stack.append((entry.path, rel))
+                    else:
+                        st = entry.stat()
+                        files.append((rel, entry.path, st.st_mtime_ns, st.st_size))
+        files.sort()
+        
+        stamp = hashlib.blake2b(
+            '\n'.join(f"{rel}\0{mtime}\0{size}" for rel, _, mtime, size in files).encode('utf-8'),
+            digest_size=16).hexdigest()
+        stamp_file = dest / '.stamp'
+        try:
+            if stamp_file.read_text() == stamp:
+                return
+        except OSError:
+            pass
+        
+        dest.mkdir(parents=True, exist_ok=True)
+        for rel, src, _, _ in files:
+            dst = dest / rel
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                dst.unlink()
+            except FileNotFoundError:
+                pass
+            try:
+                os.link(src, dst)
+            except OSError:
+                # Cross-device or unsupported filesystem
+                shutil.copyfile(src, dst)
+        stamp_file.write_text(stamp)
+    
+    def _fingerprint(self, data: Dict[str, Any]) -> str:
+        """Fingerprint everything in parsed data that reaches the rendered graph."""
+        blocks = [
+            sorted((name, info.get('type', ''), info['file'], info['dependencies'])
+                   for name, info in data[kind].items())
+            for kind in ('resources', 'data_sources', 'modules')
+        ]
+        return hashlib.blake2b(_dumps_bytes(blocks), digest_size=16).hexdigest()
+    
+    def _to_json(self, source: Union[Graph, Dict[str, Any]]) -> Dict[str, Any]:
+        """Convert a graph or parsed Terraform data to JSON format for d3.js."""
+        if isinstance(source, Graph):
+            return self._graph_to_json(source)
+        return self._cached_json(source, self._fingerprint(source))
+    
+    def _cached_json(self, data: Dict[str, Any], fp: str) -> Dict[str, Any]:
+        graph_data = self._json_cache.get(fp)
+        if graph_data is None:
+            graph_data = self._json_cache[fp] = self._data_to_json(data)
+        return graph_data
+    
+    def _to_html(self, source: Union[Graph, Dict[str, Any]]) -> str:
+        """Render the HTML visualization, reusing earlier renders of the same data."""
+        if isinstance(source, Graph):
+            return self._generate_html_template(_dumps(self._graph_to_json(source)))
+        fp = self._fingerprint(source)
+        html_content = self._html_cache.get(fp)
+        if html_content is None:
+            html_content = self._html_cache[fp] = self._generate_html_template(
+                _dumps(self._cached_json(source, fp)))
+        return html_content
+    
+    def _data_to_json(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert parsed Terraform data to JSON format for d3.js."""
+        # Graph is a plain container, so going through it keeps one node schema
+        return self._graph_to_json(self.generate_graph(data))
+    
+    def _graph_to_json(self, graph: Graph) -> Dict[str, Any]:
+        """Convert a dependency graph to JSON format for d3.js."""
         nodes = []
-        for node, attrs in graph.nodes(data=True):
+        group_of = _NODE_GROUP.get
+        for node, attrs in graph.nodes.items():
+            node_type = attrs.get('type', 'resource')
             nodes.append({
                 'id': node,
                 'name': attrs.get('name', node),
-                'type': attrs.get('type', 'resource'),
+                'type': node_type,
                 'resource_type': attrs.get('resource_type', ''),
                 'file': attrs.get('file', ''),
-                'group': self._get_node_group(attrs.get('type', 'resource'))
+                'group': group_of(node_type, _DEFAULT_GROUP)
             })
         
-        links = []
-        for edge in graph.edges():
-            links.append({
-                'source': edge[0],
-                'target': edge[1],
-                'value': 1
-            })
+        links = [
+            {'source': source, 'target': target, 'value': 1}
+            for source, target in graph.edges
+        ]
         
         return {
             'nodes': nodes,
@@ -286,315 +736,23 @@ class BlastRadius:
     
     def _get_node_color(self, node_type: str) -> str:
         """Get color for node type."""
-        colors = {
-            'resource': '#4CAF50',
-            'data': '#2196F3',
-            'module': '#FF9800'
-        }
-        return colors.get(node_type, '#9E9E9E')
+        return _NODE_COLOR.get(node_type, _DEFAULT_COLOR)
     
     def _get_node_shape(self, node_type: str) -> str:
         """Get shape for node type."""
-        shapes = {
-            'resource': 'box',
-            'data': 'ellipse',
-            'module': 'diamond'
-        }
-        return shapes.get(node_type, 'box')
+        return _NODE_SHAPE.get(node_type, _DEFAULT_SHAPE)
     
     def _get_node_group(self, node_type: str) -> int:
         """Get group for node type (for d3.js coloring)."""
-        groups = {
-            'resource': 1,
-            'data': 2,
-            'module': 3
-        }
-        return groups.get(node_type, 0)
-    
-    def _generate_html_template(self, graph_data: Dict[str, Any]) -> str:
-        """Generate HTML template with embedded d3.js visualization."""
-        return f"""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Terraform Dependency Graph - Blast Radius</title>
-    <script src="https://d3js.org/d3.v7.min.js"></script>
-    <style>
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            margin: 0;
-            padding: 20px;
-            background: #f5f5f5;
-        }}
-        .container {{
-            max-width: 1200px;
-            margin: 0 auto;
-            background: white;
-            border-radius: 8px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-            overflow: hidden;
-        }}
-        .header {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 20px;
-            text-align: center;
-        }}
-        .controls {{
-            padding: 20px;
-            border-bottom: 1px solid #eee;
-            display: flex;
-            gap: 20px;
-            align-items: center;
-            flex-wrap: wrap;
-        }}
-        .search-box {{
-            flex: 1;
-            min-width: 200px;
-        }}
-        .search-box input {{
-            width: 100%;
-            padding: 8px 12px;
-            border: 1px solid #ddd;
-            border-radius: 4px;
-            font-size: 14px;
-        }}
-        .filter-buttons {{
-            display: flex;
-            gap: 10px;
-        }}
-        .filter-btn {{
-            padding: 8px 16px;
-            border: 1px solid #ddd;
-            background: white;
-            border-radius: 4px;
-            cursor: pointer;
-            font-size: 14px;
-        }}
-        .filter-btn.active {{
-            background: #667eea;
-            color: white;
-            border-color: #667eea;
-        }}
-        .graph-container {{
-            height: 600px;
-            position: relative;
-        }}
-        .node {{
-            cursor: pointer;
-        }}
-        .node:hover {{
-            stroke: #333;
-            stroke-width: 2px;
-        }}
-        .link {{
-            stroke: #999;
-            stroke-opacity: 0.6;
-        }}
-        .tooltip {{
-            position: absolute;
-            background: rgba(0,0,0,0.8);
-            color: white;
-            padding: 8px 12px;
-            border-radius: 4px;
-            font-size: 12px;
-            pointer-events: none;
-            z-index: 1000;
-        }}
-        .legend {{
-            padding: 20px;
-            border-top: 1px solid #eee;
-        }}
-        .legend-item {{
-            display: inline-block;
-            margin-right: 20px;
-            font-size: 14px;
-        }}
-        .legend-color {{
-            display: inline-block;
-            width: 16px;
-            height: 16px;
-            margin-right: 8px;
-            border-radius: 2px;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>🚀 Terraform Dependency Graph</h1>
-            <p>Interactive visualization of your infrastructure dependencies</p>
-        </div>
-        
-        <div class="controls">
-            <div class="search-box">
-                <input type="text" id="search" placeholder="Search resources...">
-            </div>
-            <div class="filter-buttons">
-                <button class="filter-btn active" data-type="all">All</button>
-                <button class="filter-btn" data-type="resource">Resources</button>
-                <button class="filter-btn" data-type="data">Data Sources</button>
-                <button class="filter-btn" data-type="module">Modules</button>
-            </div>
-        </div>
-        
-        <div class="graph-container" id="graph"></div>
-        
-        <div class="legend">
-            <div class="legend-item">
-                <span class="legend-color" style="background: #4CAF50;"></span>
-                Resources
-            </div>
-            <div class="legend-item">
-                <span class="legend-color" style="background: #2196F3;"></span>
-                Data Sources
-            </div>
-            <div class="legend-item">
-                <span class="legend-color" style="background: #FF9800;"></span>
-                Modules
-            </div>
-        </div>
-    </div>
-
-    <script>
-        // Graph data
-        const graphData = {json.dumps(graph_data)};
-        
-        // Setup
-        const width = document.getElementById('graph').clientWidth;
-        const height = 600;
-        
-        const svg = d3.select('#graph')
-            .append('svg')
-            .attr('width', width)
-            .attr('height', height);
-        
-        const g = svg.append('g');
-        
-        // Add zoom behavior
-        const zoom = d3.zoom()
-            .on('zoom', (event) => {{
-                g.attr('transform', event.transform);
-            }});
-        
-        svg.call(zoom);
-        
-        // Create force simulation
-        const simulation = d3.forceSimulation(graphData.nodes)
-            .force('link', d3.forceLink(graphData.links).id(d => d.id).distance(100))
-            .force('charge', d3.forceManyBody().strength(-300))
-            .force('center', d3.forceCenter(width / 2, height / 2))
-            .force('collision', d3.forceCollide().radius(30));
-        
-        // Create links
-        const link = g.append('g')
-            .selectAll('line')
-            .data(graphData.links)
-            .enter().append('line')
-            .attr('class', 'link')
-            .attr('stroke-width', 2);
-        
-        // Create nodes
-        const node = g.append('g')
-            .selectAll('circle')
-            .data(graphData.nodes)
-            .enter().append('circle')
-            .attr('class', 'node')
-            .attr('r', 8)
-            .attr('fill', d => {{
-                const colors = ['#9E9E9E', '#4CAF50', '#2196F3', '#FF9800'];
-                return colors[d.group] || colors[0];
-            }})
-            .call(d3.drag()
-                .on('start', dragstarted)
-                .on('drag', dragged)
-                .on('end', dragended));
-        
-        // Add tooltips
-        const tooltip = d3.select('body').append('div')
-            .attr('class', 'tooltip')
-            .style('opacity', 0);
-        
-        node.on('mouseover', function(event, d) {{
-            tooltip.transition()
-                .duration(200)
-                .style('opacity', .9);
-            tooltip.html(`
-                <strong>${{d.name}}</strong><br/>
-                Type: ${{d.type}}<br/>
-                ${{d.resource_type ? 'Resource: ' + d.resource_type + '<br/>' : ''}}
-                File: ${{d.file}}
-            `)
-                .style('left', (event.pageX + 10) + 'px')
-                .style('top', (event.pageY - 28) + 'px');
-        }})
-        .on('mouseout', function(d) {{
-            tooltip.transition()
-                .duration(500)
-                .style('opacity', 0);
-        }});
-        
-        // Update positions
-        simulation.on('tick', () => {{
-            link
-                .attr('x1', d => d.source.x)
-                .attr('y1', d => d.source.y)
-                .attr('x2', d => d.target.x)
-                .attr('y2', d => d.target.y);
-            
-            node
-                .attr('cx', d => d.x)
-                .attr('cy', d => d.y);
-        }});
-        
-        // Drag functions
-        function dragstarted(event, d) {{
-            if (!event.active) simulation.alphaTarget(0.3).restart();
-            d.fx = d.x;
-            d.fy = d.y;
-        }}
-        
-        function dragged(event, d) {{
-            d.fx = event.x;
-            d.fy = event.y;
-        }}
-        
-        function dragended(event, d) {{
-            if (!event.active) simulation.alphaTarget(0);
-            d.fx = null;
-            d.fy = null;
-        }}
-        
-        // Search functionality
-        document.getElementById('search').addEventListener('input', function(e) {{
-            const searchTerm = e.target.value.toLowerCase();
-            node.style('opacity', d => {{
-                return d.name.toLowerCase().includes(searchTerm) || 
-                       d.type.toLowerCase().includes(searchTerm) ? 1 : 0.1;
-            }});
-        }});
-        
-        // Filter functionality
-        document.querySelectorAll('.filter-btn').forEach(btn => {{
-            btn.addEventListener('click', function() {{
-                const filterType = this.dataset.type;
-                
-                // Update active button
-                document.querySelectorAll('.filter-btn').forEach(b => b.classList.remove('active'));
-                this.classList.add('active');
-                
-                // Filter nodes
-                node.style('opacity', d => {{
-                    return filterType === 'all' || d.type === filterType ? 1 : 0.1;
-                }});
-            }});
-        }});
-    </script>
-</body>
-</html>
-"""
+        return _NODE_GROUP.get(node_type, _DEFAULT_GROUP)
+    
+    def _generate_html_template(self, graph_data_json: str) -> str:
+        """Generate HTML template with embedded d3.js visualization.
+        
+        Takes the graph already serialized, so callers holding the JSON
+        (e.g. the web server) splice it in without encoding it again.
+        """
+        return self._tmpl.render(graph_data_json=_script_safe(graph_data_json))
     
     def serve(self, path: str, host: str = '127.0.0.1', port: int = 5000):
         """Start web server for interactive visualization."""
@@ -604,26 +762,55 @@ class BlastRadius:
         data = self.parse_terraform(path)
         self.terraform_path = path
         
-        # Generate graph
-        graph = self.generate_graph(data)
-        self.graph_data = self._graph_to_json(graph)
-        
-        print(f"Generated graph with {len(graph.nodes)} nodes and {len(graph.edges)} edges")
+        # Generate graph data; the web UI never needs a NetworkX graph
+        self._fp = self._fingerprint(data)
+        self.graph_data = self._cached_json(data, self._fp)
+        # The graph is fixed for the server's lifetime, so serialize and compress it once
+        self._json_bytes = _dumps_bytes(self.graph_data)
+        self._json_gzip = gzip.compress(self._json_bytes, compresslevel=6)
+        self._graph_json_str = self._json_bytes.decode('utf-8')
+        self._html_bytes = self._generate_html_template(self._graph_json_str).encode('utf-8')
+        
+        print(f"Generated graph with {len(self.graph_data['nodes'])} nodes "
+              f"and {len(self.graph_data['links'])} edges")
         print(f"Starting web server at http://{host}:{port}")
         
         # Setup Flask routes
         @self.app.route('/')
         def index():
-            return render_template('index.html', graph_data=self.graph_data)
+            return Response(self._html_bytes, mimetype='text/html', direct_passthrough=True)
         
         @self.app.route('/api/graph')
         def api_graph():
-            return jsonify(self.graph_data)
+            gzipped = request.accept_encodings['gzip'] > 0
+            etag = f"{self._fp}-gzip" if gzipped else self._fp
+            if request.if_none_match.contains(etag):
+                response = Response(status=304)
+            elif gzipped:
+                response = Response(self._json_gzip, mimetype='application/json',
+                                    headers={'Content-Encoding': 'gzip'})
+            else:
+                response = Response(self._json_bytes, mimetype='application/json')
+            # Revalidate every time: the ETag makes that a cheap 304 until the server restarts
+            response.headers['Cache-Control'] = 'no-cache'
+            response.headers['Vary'] = 'Accept-Encoding'
+            response.set_etag(etag)
+            return response
+        
+        @self.app.route('/api/blast-radius/<path:node>')
+        def api_blast_radius(node):
+            # Only analytics need graph structure, so build it on first use
+            if self._graph is None:
+                self._graph = self.generate_graph(data).to_networkx()
+            try:
+                affected = self.get_blast_radius(self._graph, node)
+            except KeyError:
+                abort(404)
+            return jsonify({'node': node, 'affected': affected})
         
         @self.app.route('/static/<path:filename>')
         def static_files(filename):
-            static_dir = Path(__file__).parent / 'static'
-            return send_from_directory(static_dir, filename)
+            return send_from_directory(STATIC_DIR, filename)
         
         # Start server
         self.app.run(host=host, port=port, debug=False)
@@ -650,25 +837,30 @@ Examples:
     parser.add_argument('--output', default='output', help='Output directory')
     parser.add_argument('--port', type=int, default=5000, help='Web server port')
     parser.add_argument('--host', default='127.0.0.1', help='Web server host')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write the parse cache')
     
     args = parser.parse_args()
     
     try:
-        blast_radius = BlastRadius()
+        blast_radius = BlastRadius(cache_dir=None if args.no_cache else DEFAULT_CACHE_DIR)
         
         if args.serve:
             blast_radius.serve(args.path, args.host, args.port)
         elif args.export:
             print(f"Parsing Terraform configuration from: {args.path}")
             data = blast_radius.parse_terraform(args.path)
-            graph = blast_radius.generate_graph(data)
+            
+            # Only the Graphviz exports need an actual graph structure
+            if args.format in ('svg', 'png', 'all'):
+                graph = blast_radius.generate_graph(data)
             
             if args.format == 'all':
                 # Export all formats
-                html_file = blast_radius.export_html(graph, f"{args.output}/index.html")
-                svg_file = blast_radius.export_svg(graph, f"{args.output}/graph.svg")
-                png_file = blast_radius.export_png(graph, f"{args.output}/graph.png")
-                json_file = blast_radius.export_json(graph, f"{args.output}/graph.json")
+                html_file = blast_radius.export_html(data, f"{args.output}/index.html")
+                images = blast_radius.export_images(graph, {'svg': f"{args.output}/graph.svg",
+                                                            'png': f"{args.output}/graph.png"})
+                svg_file, png_file = images['svg'], images['png']
+                json_file = blast_radius.export_json(data, f"{args.output}/graph.json")
                 
                 print(f"Exported all formats to {args.output}/")
                 print(f"  HTML: {html_file}")
@@ -678,13 +870,13 @@ Examples:
             else:
                 # Export single format
                 if args.format == 'html':
-                    output_file = blast_radius.export_html(graph, f"{args.output}/index.html")
+                    output_file = blast_radius.export_html(data, f"{args.output}/index.html")
                 elif args.format == 'svg':
                     output_file = blast_radius.export_svg(graph, f"{args.output}/graph.svg")
                 elif args.format == 'png':
                     output_file = blast_radius.export_png(graph, f"{args.output}/graph.png")
                 elif args.format == 'json':
-                    output_file = blast_radius.export_json(graph, f"{args.output}/graph.json")
+                    output_file = blast_radius.export_json(data, f"{args.output}/graph.json")
                 
                 print(f"Exported {args.format.upper()} to: {output_file}")
         else:
@@ -23,7 +23,7 @@ def test_basic_functionality():
         from blast_radius import BlastRadius
         
         # Create instance
-        app = BlastRadius()
+        app = BlastRadius(cache_dir=None)
         print("✅ Successfully created BlastRadius instance")
         
         # Test node color function
@@ -47,7 +47,7 @@ def test_terraform_parsing():
         from blast_radius import BlastRadius
         import tempfile
         
-        app = BlastRadius()
+        app = BlastRadius(cache_dir=None)
         
         # Create a temporary Terraform file
         with tempfile.TemporaryDirectory() as temp_dir:
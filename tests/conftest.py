@@ -0,0 +1,24 @@
+"""
+Shared pytest configuration for Custom Blast Radius tests
+"""
+
+import os
+import tempfile
+import pytest
+
+RAM_TMPDIR = "/dev/shm"
+
+
+@pytest.fixture(scope="session", autouse=True)
+def fast_tmp(tmp_path_factory):
+    """Keep test scratch files on RAM-backed storage when the platform has it.
+
+    Runs before any test asks for ``tmp_path``, so pytest's base temp
+    directory is created under /dev/shm. An explicit TMPDIR always wins.
+    """
+    if "TMPDIR" not in os.environ and os.path.isdir(RAM_TMPDIR) and os.access(RAM_TMPDIR, os.W_OK):
+        previous, tempfile.tempdir = tempfile.tempdir, RAM_TMPDIR
+        yield RAM_TMPDIR
+        tempfile.tempdir = previous
+    else:
+        yield str(tmp_path_factory.mktemp("fast_tmp"))
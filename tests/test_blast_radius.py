@@ -4,36 +4,16 @@ Tests for Custom Blast Radius application
 """
 
 import pytest
-import tempfile
-import os
+from typing import Final
+import gzip
+import json
 from pathlib import Path
-from blast_radius import BlastRadius
+from unittest import mock
+import blast_radius as blast_radius_module
+from blast_radius import BlastRadius, Graph, _extract_dependencies, _parse_source
 
 
-class TestBlastRadius:
-    """Test cases for BlastRadius class"""
-
-    def setup_method(self):
-        """Set up test fixtures"""
-        self.blast_radius = BlastRadius()
-
-    def test_parse_terraform_empty_directory(self):
-        """Test parsing empty directory"""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            with pytest.raises(ValueError, match="No Terraform files found"):
-                self.blast_radius.parse_terraform(temp_dir)
-
-    def test_parse_terraform_nonexistent_directory(self):
-        """Test parsing nonexistent directory"""
-        with pytest.raises(FileNotFoundError):
-            self.blast_radius.parse_terraform("/nonexistent/path")
-
-    def test_parse_terraform_valid_files(self):
-        """Test parsing valid Terraform files"""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Create a simple Terraform file
-            tf_file = Path(temp_dir) / "main.tf"
-            tf_content = '''
+_TF_CONTENT: Final[str] = '''
 resource "aws_vpc" "main" {
   cidr_block = "10.0.0.0/16"
   
@@ -51,18 +31,164 @@ resource "aws_subnet" "main" {
   }
 }
 '''
-            tf_file.write_text(tf_content)
 
-            # Parse the Terraform configuration
-            result = self.blast_radius.parse_terraform(temp_dir)
 
-            # Verify the result
-            assert "resources" in result
-            assert "aws_vpc.main" in result["resources"]
-            assert "aws_subnet.main" in result["resources"]
-            assert result["resources"]["aws_subnet.main"]["dependencies"] == ["aws_vpc.main"]
+@pytest.fixture(scope="class")
+def blast_radius():
+    """Shared parser instance; tests that mutate server state build their own"""
+    return BlastRadius(cache_dir=None)
+
+
+class TestBlastRadius:
+    """Test cases for BlastRadius class"""
+
+    def test_parse_terraform_empty_directory(self, blast_radius, tmp_path):
+        """Test parsing empty directory"""
+        with pytest.raises(ValueError, match="No Terraform files found"):
+            blast_radius.parse_terraform(str(tmp_path))
+
+    def test_parse_terraform_nonexistent_directory(self, blast_radius):
+        """Test parsing nonexistent directory"""
+        with pytest.raises(FileNotFoundError):
+            blast_radius.parse_terraform("/nonexistent/path")
+
+    def test_parse_terraform_valid_files(self, blast_radius):
+        """Test parsing valid Terraform files"""
+        # Parse the Terraform configuration
+        result = blast_radius.parse_terraform_from_sources({"main.tf": _TF_CONTENT})
+
+        # Verify the result
+        assert "resources" in result
+        assert "aws_vpc.main" in result["resources"]
+        assert "aws_subnet.main" in result["resources"]
+        assert result["resources"]["aws_subnet.main"]["dependencies"] == ["aws_vpc.main"]
+        assert result["resources"]["aws_subnet.main"]["file"] == "main.tf"
+
+    def test_parse_terraform_valid_files_on_disk(self, blast_radius, tmp_path):
+        """Test parsing valid Terraform files from a directory"""
+        (tmp_path / "main.tf").write_text(_TF_CONTENT)
+
+        result = blast_radius.parse_terraform(str(tmp_path))
+
+        assert result == blast_radius.parse_terraform_from_sources({"main.tf": _TF_CONTENT}, str(tmp_path))
+
+    def test_parse_terraform_crlf_file(self, blast_radius, tmp_path):
+        """Test files with Windows line endings parse like their LF equivalent"""
+        (tmp_path / "main.tf").write_bytes(_TF_CONTENT.replace("\n", "\r\n").encode("utf-8"))
+
+        result = blast_radius.parse_terraform(str(tmp_path))
 
-    def test_generate_graph(self):
+        assert result == blast_radius.parse_terraform_from_sources({"main.tf": _TF_CONTENT}, str(tmp_path))
+
+    def test_parse_terraform_parallel_bad_file(self, blast_radius, tmp_path):
+        """Test that a malformed file in the process-pool path is skipped, not fatal"""
+        for i in range(3):
+            (tmp_path / f"vpc{i}.tf").write_text(f'resource "aws_vpc" "v{i}" {{\n  cidr_block = "10.{i}.0.0/16"\n}}\n')
+        (tmp_path / "broken.tf").write_text('resource "x" {{{ broken')
+
+        with mock.patch("blast_radius.PARALLEL_MIN_FILES", 2):
+            result = blast_radius.parse_terraform(str(tmp_path))
+
+        assert sorted(result['resources']) == ['aws_vpc.v0', 'aws_vpc.v1', 'aws_vpc.v2']
+
+    def test_parse_terraform_skips_provider_cache(self, blast_radius, tmp_path):
+        """Test .terraform directories are not walked"""
+        vendored = tmp_path / ".terraform" / "modules" / "vpc"
+        vendored.mkdir(parents=True)
+        (vendored / "main.tf").write_text('resource "aws_vpc" "vendored" {\n}\n')
+        nested = tmp_path / "network"
+        nested.mkdir()
+        (nested / "main.tf").write_text('resource "aws_vpc" "main" {\n}\n')
+
+        result = blast_radius.parse_terraform(str(tmp_path))
+
+        assert list(result["resources"]) == ["aws_vpc.main"]
+        assert result["resources"]["aws_vpc.main"]["file"] == str(Path("network") / "main.tf")
+
+    def test_parse_terraform_uses_cache(self, tmp_path):
+        """Test that unchanged files are served from the parse cache"""
+        tf_dir = tmp_path / "tf"
+        tf_dir.mkdir()
+        (tf_dir / "main.tf").write_text('resource "aws_vpc" "main" {\n  cidr_block = "10.0.0.0/16"\n}\n')
+        cache_dir = tmp_path / "cache"
+        blast_radius = BlastRadius(cache_dir=cache_dir)
+
+        first = blast_radius.parse_terraform(str(tf_dir))
+        assert any(cache_dir.glob(f"*-{blast_radius_module._CACHE_BACKEND}-*.pkl"))
+
+        # A cache hit must not need the parser at all
+        with mock.patch("blast_radius._parse_source", side_effect=AssertionError("re-parsed")):
+            second = blast_radius.parse_terraform(str(tf_dir))
+        assert second == first
+
+        # Entries written under an older cache schema are never served
+        with mock.patch("blast_radius._CACHE_PREFIX", "stale-schema"), \
+                mock.patch("blast_radius._parse_source", wraps=blast_radius_module._parse_source) as parse:
+            assert blast_radius.parse_terraform(str(tf_dir)) == first
+        parse.assert_called_once()
+
+    def test_parse_terraform_prunes_stat_index(self, tmp_path):
+        """Test that the stat index forgets deleted files and old roots"""
+        cache_dir = tmp_path / "cache"
+        blast_radius = BlastRadius(cache_dir=cache_dir)
+        roots = []
+        for name in ("a", "b"):
+            root = tmp_path / name
+            root.mkdir()
+            (root / "main.tf").write_text('resource "aws_vpc" "main" {\n  cidr_block = "10.0.0.0/16"\n}\n')
+            (root / "extra.tf").write_text('resource "aws_vpc" "extra" {\n  cidr_block = "10.1.0.0/16"\n}\n')
+            roots.append(str(root.resolve()))
+
+        blast_radius.parse_terraform(roots[0])
+        (tmp_path / "a" / "extra.tf").unlink()
+        blast_radius.parse_terraform(roots[0])
+        assert set(blast_radius._load_stat_index()) == {(roots[0], "main.tf")}
+
+        with mock.patch("blast_radius.STAT_INDEX_MAX_ROOTS", 1):
+            blast_radius.parse_terraform(roots[1])
+        assert {root for root, _ in blast_radius._load_stat_index()} == {roots[1]}
+
+    def test_parse_source_hcl_rs_shape(self):
+        """Test the merged single-mapping shape returned by the hcl-rs backend"""
+        hcl_rs = mock.Mock()
+        hcl_rs.loads.return_value = {
+            "resource": {
+                "aws_vpc": {
+                    "a": {"cidr_block": "10.0.0.0/16"},
+                    "b": {"cidr_block": "10.1.0.0/16", "tags": {"Peer": "${aws_vpc.a.id}"}},
+                }
+            }
+        }
+
+        with mock.patch("blast_radius._hcl_rs", hcl_rs):
+            resources, data_sources, modules = _parse_source("ignored", "main.tf")
+
+        hcl_rs.loads.assert_called_once_with("ignored")
+        assert {name: info["dependencies"] for name, info in resources.items()} == {
+            "aws_vpc.a": [],
+            "aws_vpc.b": ["aws_vpc.a"],
+        }
+        assert data_sources == {} and modules == {}
+
+    def test_extract_dependencies(self):
+        """Test references are normalized to block addresses"""
+        config = {
+            "vpc_id": "${aws_vpc.main.id}",
+            "subnet_ids": ["${aws_subnet.private[count.index].id}"],
+            "name": "${var.env}-${local.suffix}",
+            "ami": "${data.aws_ami.ubuntu.id}",
+            "tags": {"Cluster": "${module.eks.cluster_name}"},
+            "source": "./modules/vpc",
+        }
+        assert _extract_dependencies(config) == [
+            "./modules/vpc",
+            "aws_subnet.private",
+            "aws_vpc.main",
+            "data.aws_ami.ubuntu",
+            "module.eks",
+        ]
+
+    def test_generate_graph(self, blast_radius):
         """Test graph generation"""
         # Create test data
         data = {
@@ -86,7 +212,7 @@ resource "aws_subnet" "main" {
         }
 
         # Generate graph
-        graph = self.blast_radius.generate_graph(data)
+        graph = blast_radius.generate_graph(data)
 
         # Verify graph structure
         assert len(graph.nodes) == 2
@@ -95,55 +221,209 @@ resource "aws_subnet" "main" {
         assert "aws_subnet.main" in graph.nodes
         assert ("aws_vpc.main", "aws_subnet.main") in graph.edges
 
-    def test_export_json(self):
+        nx_graph = graph.to_networkx()
+        assert set(nx_graph.edges) == {("aws_vpc.main", "aws_subnet.main")}
+        assert nx_graph.nodes["aws_subnet.main"]["resource_type"] == "aws_subnet"
+
+    def test_get_blast_radius(self, blast_radius):
+        """Test blast radius follows dependencies transitively"""
+        graph = Graph(
+            nodes={"aws_vpc.main": {}, "aws_subnet.main": {}, "aws_instance.web": {}, "aws_s3_bucket.logs": {}},
+            edges=[("aws_vpc.main", "aws_subnet.main"), ("aws_subnet.main", "aws_instance.web")],
+        )
+
+        assert blast_radius.get_blast_radius(graph, "aws_vpc.main") == ["aws_instance.web", "aws_subnet.main"]
+        assert blast_radius.get_blast_radius(graph, "aws_s3_bucket.logs") == []
+        with pytest.raises(KeyError):
+            blast_radius.get_blast_radius(graph, "aws_vpc.missing")
+
+    def test_export_json(self, blast_radius, tmp_path):
         """Test JSON export"""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Create test data
-            data = {
-                "resources": {
-                    "aws_vpc.main": {
-                        "type": "aws_vpc",
-                        "name": "main",
-                        "file": "main.tf",
-                        "dependencies": []
-                    }
-                },
-                "data_sources": {},
-                "modules": {},
-                "path": "/test"
-            }
+        # Create test data
+        data = {
+            "resources": {
+                "aws_vpc.main": {
+                    "type": "aws_vpc",
+                    "name": "main",
+                    "file": "main.tf",
+                    "dependencies": []
+                }
+            },
+            "data_sources": {},
+            "modules": {},
+            "path": "/test"
+        }
+
+        # Generate graph
+        graph = blast_radius.generate_graph(data)
+
+        # Export JSON
+        output_file = str(tmp_path / "test.json")
+        result = blast_radius.export_json(graph, output_file)
+
+        # Verify file was created
+        assert Path(result).exists()
+        assert result.endswith(".json")
+
+    def test_data_to_json_matches_graph(self, blast_radius):
+        """Test JSON conversion from parsed data matches the Graph path and links modules"""
+        data = {
+            "resources": {
+                "aws_vpc.main": {"type": "aws_vpc", "name": "main", "file": "main.tf", "dependencies": []},
+                "aws_subnet.main": {"type": "aws_subnet", "name": "main", "file": "main.tf",
+                                    "dependencies": ["aws_vpc.main", "var.unknown", "aws_vpc.main"]},
+                "aws_s3_bucket.logs": {"type": "aws_s3_bucket", "name": "logs", "file": "s3.tf",
+                                       "dependencies": ["module.eks"]}
+            },
+            "data_sources": {
+                "data.aws_ami.ubuntu": {"type": "aws_ami", "name": "ubuntu", "file": "data.tf", "dependencies": []}
+            },
+            "modules": {
+                "module.eks": {"name": "eks", "file": "eks.tf",
+                               "dependencies": ["./modules/eks", "aws_subnet.main"]}
+            },
+            "path": "/test"
+        }
+
+        direct = blast_radius._data_to_json(data)
+        via_graph = blast_radius._graph_to_json(blast_radius.generate_graph(data))
+
+        assert direct == via_graph
+        links = {(link["source"], link["target"]) for link in direct["links"]}
+        assert ("module.eks", "aws_s3_bucket.logs") in links
+        assert ("aws_subnet.main", "module.eks") in links
+        module_node = next(node for node in direct["nodes"] if node["type"] == "module")
+        assert (module_node["id"], module_node["name"]) == ("module.eks", "eks")
+
+    def test_build_dot_layout_engine(self, blast_radius):
+        """Test large graphs switch from dot to sfdp layout"""
+        small = Graph(nodes={"a.x": {}, "b.x": {}, "c.x": {}}, edges=[("a.x", "b.x"), ("b.x", "c.x")])
+        large = Graph(nodes={f"a.n{i}": {} for i in range(BlastRadius.LARGE_GRAPH_THRESHOLD + 1)}, edges=[])
+
+        assert "rankdir=TB;" in blast_radius._build_dot(small)
+        assert "layout=sfdp;" in blast_radius._build_dot(large)
+
+    def test_build_dot_quotes_ids(self, blast_radius):
+        """Test node ids and labels are escaped in the DOT source"""
+        graph = Graph(
+            nodes={
+                'aws_s3_bucket.logs': {'type': 'resource', 'name': 'say "hi"'},
+                'module\\x': {'type': 'module', 'name': 'x'},
+            },
+            edges=[('module\\x', 'aws_s3_bucket.logs')],
+        )
+
+        source = blast_radius._build_dot(graph)
+
+        assert '"aws_s3_bucket.logs" [label="say \\"hi\\"",color="#4CAF50",shape="box",style=filled];' in source
+        assert '"module\\\\x" -> "aws_s3_bucket.logs";' in source
+
+    def test_export_images_single_dot_run(self, blast_radius, tmp_path):
+        """Test every image format comes from one dot invocation fed over stdin"""
+        graph = Graph(nodes={"aws_vpc.main": {"type": "resource", "name": "main"}}, edges=[])
+
+        with mock.patch("blast_radius.subprocess.run") as run:
+            result = blast_radius.export_images(graph, {"svg": str(tmp_path / "graph.svg"),
+                                                        "png": str(tmp_path / "graph.png")})
+
+        run.assert_called_once()
+        (cmd,), kwargs = run.call_args
+        assert cmd == ["dot", "-Tsvg", f"-o{tmp_path / 'graph.svg'}", "-Tpng", f"-o{tmp_path / 'graph.png'}"]
+        assert kwargs["input"] == blast_radius._build_dot(graph).encode("utf-8")
+        assert result == {"svg": str(tmp_path / "graph.svg"), "png": str(tmp_path / "graph.png")}
+
+    def test_export_images_missing_dot(self, blast_radius, tmp_path):
+        """Test a missing Graphviz binary surfaces as RuntimeError"""
+        graph = Graph(nodes={}, edges=[])
+
+        with mock.patch("blast_radius.subprocess.run", side_effect=FileNotFoundError("dot")):
+            with pytest.raises(RuntimeError, match="Graphviz"):
+                blast_radius.export_svg(graph, str(tmp_path / "graph.svg"))
+
+    def test_serve_api_graph(self, tmp_path):
+        """Test the graph API serves the pre-serialized graph"""
+        (tmp_path / "main.tf").write_text(
+            'resource "aws_vpc" "main" {\n  cidr_block = "10.0.0.0/16"\n}\n'
+            'resource "aws_subnet" "main" {\n  vpc_id = aws_vpc.main.id\n}\n'
+        )
+        blast_radius = BlastRadius(cache_dir=None)
+        with mock.patch.object(blast_radius.app, "run"):
+            blast_radius.serve(str(tmp_path))
+
+        client = blast_radius.app.test_client()
+        response = client.get("/api/graph")
+
+        assert response.status_code == 200
+        assert response.mimetype == "application/json"
+        assert response.get_json() == blast_radius.graph_data
+        assert response.get_json()["links"] == [
+            {"source": "aws_vpc.main", "target": "aws_subnet.main", "value": 1}
+        ]
+
+        gzipped = client.get("/api/graph", headers={"Accept-Encoding": "gzip"})
+        assert gzipped.headers["Content-Encoding"] == "gzip"
+        assert json.loads(gzip.decompress(gzipped.data)) == blast_radius.graph_data
+
+        revalidated = client.get("/api/graph", headers={"If-None-Match": response.headers["ETag"]})
+        assert revalidated.status_code == 304
+        assert revalidated.data == b""
+
+        index = client.get("/")
+        assert index.status_code == 200
+        assert index.mimetype == "text/html"
+        assert f"const graphData = {response.get_data(as_text=True)};" in index.get_data(as_text=True)
+
+        blast = client.get("/api/blast-radius/aws_vpc.main")
+        assert blast.get_json() == {"node": "aws_vpc.main", "affected": ["aws_subnet.main"]}
+        assert client.get("/api/blast-radius/aws_vpc.missing").status_code == 404
+
+    def test_html_escapes_script_breakout(self, blast_radius):
+        """Test graph strings cannot close the script block that embeds them"""
+        label = "</script><script>alert('x')</script>&"
+        graph = Graph(nodes={"aws_s3_bucket.x": {"type": "resource", "name": label, "file": label}}, edges=[])
+
+        html = blast_radius._to_html(graph)
+        embedded = html.split("const graphData = ", 1)[1].split(";\n", 1)[0]
+
+        assert "<script>alert" not in html
+        assert json.loads(embedded)["nodes"][0]["name"] == label
+
+    def test_export_html_syncs_static_once(self, blast_radius, tmp_path):
+        """Test static assets are mirrored and skipped when unchanged"""
+        static_dir = tmp_path / "static"
+        (static_dir / "css").mkdir(parents=True)
+        (static_dir / "css" / "style.css").write_text("body {}")
+        data = {"resources": {}, "data_sources": {}, "modules": {}, "path": "/test"}
+        output_dir = tmp_path / "out"
+
+        with mock.patch("blast_radius.STATIC_DIR", static_dir):
+            blast_radius.export_html(data, str(output_dir))
+            assert (output_dir / "static" / "css" / "style.css").read_text() == "body {}"
+
+            with mock.patch("blast_radius.os.link") as link, \
+                    mock.patch("blast_radius.shutil.copyfile") as copyfile:
+                blast_radius.export_html(data, str(output_dir))
+            link.assert_not_called()
+            copyfile.assert_not_called()
+
+        # An empty static directory still produces a (stamped) mirror
+        empty_static = tmp_path / "empty_static"
+        empty_static.mkdir()
+        with mock.patch("blast_radius.STATIC_DIR", empty_static):
+            blast_radius.export_html(data, str(tmp_path / "out_empty"))
+        assert (tmp_path / "out_empty" / "static" / ".stamp").is_file()
 
-            # Generate graph
-            graph = self.blast_radius.generate_graph(data)
-
-            # Export JSON
-            output_file = os.path.join(temp_dir, "test.json")
-            result = self.blast_radius.export_json(graph, output_file)
-
-            # Verify file was created
-            assert os.path.exists(result)
-            assert result.endswith(".json")
-
-    def test_get_node_color(self):
-        """Test node color assignment"""
-        assert self.blast_radius._get_node_color("resource") == "#4CAF50"
-        assert self.blast_radius._get_node_color("data") == "#2196F3"
-        assert self.blast_radius._get_node_color("module") == "#FF9800"
-        assert self.blast_radius._get_node_color("unknown") == "#9E9E9E"
-
-    def test_get_node_shape(self):
-        """Test node shape assignment"""
-        assert self.blast_radius._get_node_shape("resource") == "box"
-        assert self.blast_radius._get_node_shape("data") == "ellipse"
-        assert self.blast_radius._get_node_shape("module") == "diamond"
-        assert self.blast_radius._get_node_shape("unknown") == "box"
-
-    def test_get_node_group(self):
-        """Test node group assignment"""
-        assert self.blast_radius._get_node_group("resource") == 1
-        assert self.blast_radius._get_node_group("data") == 2
-        assert self.blast_radius._get_node_group("module") == 3
-        assert self.blast_radius._get_node_group("unknown") == 0
+    @pytest.mark.parametrize("kind,color,shape,group", [
+        ("resource", "#4CAF50", "box", 1),
+        ("data", "#2196F3", "ellipse", 2),
+        ("module", "#FF9800", "diamond", 3),
+        ("unknown", "#9E9E9E", "box", 0),
+    ])
+    def test_node_attrs(self, blast_radius, kind, color, shape, group):
+        """Test node color, shape and group assignment"""
+        assert blast_radius._get_node_color(kind) == color
+        assert blast_radius._get_node_shape(kind) == shape
+        assert blast_radius._get_node_group(kind) == group
 
 
 def test_main_import():